@@ -0,0 +1,74 @@
+import pytest
+from products import Product, NonStockedProduct, LimitedProduct
+from promotions import SecondHalfPrice, ThirdOneFree, PercentDiscount
+from store import Store
+
+
+# Fixture scopes: the session-scoped promotions and the module-scoped stores
+# hold data no test changes; the products and setup_store, which tests buy
+# from or modify, are function-scoped and fresh per test.
+
+@pytest.fixture(scope="session")
+def promotions():
+    """
+    Fixture with the sample promotions. Promotions keep no per-product
+    state, so one set is shared by the whole test session.
+    """
+    return (SecondHalfPrice("Second Half price!"),
+            ThirdOneFree("Third One Free!"),
+            PercentDiscount("30% off!", percent=30))
+
+
+@pytest.fixture
+def macbook(promotions):
+    """Fixture with a stocked product on the second half price promotion."""
+    product = Product("MacBook Air M2", price=1450, quantity=100)
+    product.promotion = promotions[0]
+    return product
+
+
+@pytest.fixture
+def earbuds(promotions):
+    """Fixture with a stocked product on the third one free promotion."""
+    product = Product("Bose QuietComfort Earbuds", price=250, quantity=500)
+    product.promotion = promotions[1]
+    return product
+
+
+@pytest.fixture
+def license_(promotions):
+    """Fixture with a non-stocked product on the 30% off promotion."""
+    product = NonStockedProduct("Windows License", price=125)
+    product.promotion = promotions[2]
+    return product
+
+
+@pytest.fixture
+def shipping():
+    """Fixture with a limited product without a promotion."""
+    return LimitedProduct("Shipping", price=10, quantity=250, maximum=1)
+
+
+@pytest.fixture
+def setup_store(macbook, earbuds, license_, shipping):
+    """Fixture to set up a store with products for testing."""
+    return Store([macbook, earbuds, license_, shipping])
+
+
+@pytest.fixture(scope="module")
+def stores():
+    """
+    Fixture to create example store instances. Combining stores returns a
+    new Store and leaves these untouched, so they are shared by the module.
+    """
+    store1 = Store([
+        Product("Product A", quantity=10, price=5.0),
+        Product("Product B", quantity=5, price=10.0)
+    ])
+    store2 = Store([
+        Product("Product C", quantity=3, price=7.0),
+        Product("Product D", quantity=2, price=15.0)
+    ])
+    empty_store = Store([])
+
+    return store1, store2, empty_store
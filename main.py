@@ -1,19 +1,57 @@
 import sys
+try:
+    import readline  # noqa: F401  (enables line editing and buffered input())
+except ImportError:
+    pass
 import products
 import store
 import promotions
 
 
+def show_total_quantity(best_buy):
+    """
+    Prints the total quantity of items in the store.
+
+    Args:
+        best_buy (Store): The store instance containing the products.
+    """
+    print(f"Total of {best_buy.total_quantity} items in store")
+
+
+def quit_store(best_buy):
+    """
+    Says goodbye and exits the program.
+
+    Args:
+        best_buy (Store): The store instance containing the products.
+    """
+    print("Thanks for visiting Best Buy Shop! Bye!")
+    sys.exit(0)
+
+
+# Each menu entry pairs its label with the action run for it
+MENU_ENTRIES = (
+    ("List all products in store", store.Store.display_products),
+    ("Show total amount in store", show_total_quantity),
+    ("Make an order", store.Store.make_order),
+    ("Quit", quit_store),
+)
+
+# Maps the exact text of each valid choice to its action
+_CHOICES = {str(number): action
+            for number, (_, action) in enumerate(MENU_ENTRIES, start=1)}
+
+# The menu never changes, so it is rendered once at import time
+_MENU = "\n".join(["\n\tStore Menu", "\t----------",
+                   *(f"{number}. {label}"
+                     for number, (label, _) in enumerate(MENU_ENTRIES, start=1))])
+
+
 def display_menu():
     """
     Displays the menu to the user.
     """
-    print("\n\tStore Menu")
-    print("\t----------")
-    print("1. List all products in store")
-    print("2. Show total amount in store")
-    print("3. Make an order")
-    print("4. Quit")
+    print(_MENU)
 
 
 def start(best_buy):
@@ -25,16 +63,9 @@ def start(best_buy):
     """
     while True:
         display_menu()
-        choice = input("Please choose a number: ").strip()
-        if choice == '1':
-            best_buy.display_products()
-        elif choice == '2':
-            print(f"Total of {best_buy.total_quantity} items in store")
-        elif choice == '3':
-            best_buy.make_order()
-        elif choice == '4':
-            print("Thanks for visiting Best Buy Shop! Bye!")
-            sys.exit(0)
+        action = _CHOICES.get(input("Please choose a number: ").strip())
+        if action:
+            action(best_buy)
         else:
             print("Error with your choice! Try again.")
 
@@ -1,5 +1,53 @@
+import sys
+import weakref
+from itertools import count
+
 from promotions import Promotion
 
+# Messages of the validation errors, shared by the raise sites and the tests
+EMPTY_NAME_ERROR = "Product name can not be empty."
+PRICE_ERROR = "Price should be a positive number."
+QUANTITY_ERROR = "Quantity should be a positive number."
+QUANTITY_SETTER_ERROR = "Quantity should be a whole positive number."
+ACTIVE_ERROR = "Active must be a boolean value."
+PROMOTION_ERROR = "Promotion must be an instance of the Promotion class."
+INACTIVE_ERROR = "Product Inactive"
+BUY_QUANTITY_ERROR = "Quantity to buy must be a number greater than zero."
+NON_STOCKED_QUANTITY_ERROR = "Cannot set quantity for a non-stocked product."
+
+
+def _is_whole(value, minimum=0):
+    """
+    Checks that a value is a whole number no smaller than the given minimum.
+
+    The exact type check is cheaper than isinstance() and also rejects bools.
+
+    Args:
+        value: The value to check.
+        minimum (int): The smallest accepted value.
+
+    Returns:
+        bool: True if the value is an int of at least the minimum, False otherwise.
+    """
+    return type(value) is int and value >= minimum
+
+
+def _intern_name(name):
+    """
+    Interns a product name, so equal names compare by identity in the store
+    index and carts.
+
+    Only exact strings can be interned; other names, such as str subclasses,
+    are kept as given.
+
+    Args:
+        name: The product name.
+
+    Returns:
+        The interned name, or the name itself if it is not an exact str.
+    """
+    return sys.intern(name) if type(name) is str else name
+
 
 class Product:
     """
@@ -10,8 +58,16 @@ class Product:
         _price (float): The price of the product.
         _quantity (int): The available quantity of the product.
         _active (bool): Indicates whether the product is active.
+        _stores (WeakSet): The stores holding this product, kept in sync with its stock.
+                           Weak references, so a product does not keep a store alive.
+        _id (int): A unique number identifying the product instance.
     """
 
+    _ids = count()
+
+    __slots__ = ('_name', '_price', '_quantity', '_active', '_promotion', '_desc_cache',
+                 '_hash', '_stores', '_id')
+
     def __init__(self, name, price, quantity):
         """
         Initializes a new Product instance.
@@ -25,43 +81,85 @@ class Product:
             ValueError: If the name is empty, or if price or quantity are not positive numbers.
         """
         if not name:
-            raise ValueError("Product name can not be empty.")
-        if not isinstance(price, (int, float)) or price < 0:
-            raise ValueError("Price should be a positive number.")
-        if not isinstance(quantity, int) or quantity < 0:
-            raise ValueError("Quantity should be a positive number.")
-        self._name = name
+            raise ValueError(EMPTY_NAME_ERROR)
+        if type(price) not in (int, float) or price < 0:
+            raise ValueError(PRICE_ERROR)
+        if not _is_whole(quantity):
+            raise ValueError(QUANTITY_ERROR)
+        self._name = _intern_name(name)
         self._price = price
         self._quantity = quantity
         self._active = True
         self._promotion = None
+        self._desc_cache = None
+        self._hash = hash(self._name)
+        self._stores = weakref.WeakSet()
+        self._id = next(Product._ids)
+
+    # Per-instance bookkeeping that is rebuilt rather than copied or pickled:
+    # the store references and the id belong to this instance only, and the
+    # name hash is only valid within the running process.
+    _UNCOPIED_SLOTS = ('_hash', '_stores', '_id')
+
+    def __getstate__(self):
+        """
+        Returns the state of the product for pickling and copying.
+
+        Returns:
+            dict: The slot values, without the per-instance bookkeeping.
+        """
+        return {slot: getattr(self, slot)
+                for cls in type(self).__mro__
+                for slot in cls.__dict__.get('__slots__', ())
+                if slot not in Product._UNCOPIED_SLOTS}
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled or copied product as a new instance that is not
+        held by any store.
+
+        Args:
+            state (dict): The slot values returned by __getstate__.
+        """
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._name = _intern_name(self._name)
+        self._hash = hash(self._name)
+        self._stores = weakref.WeakSet()
+        self._id = next(Product._ids)
 
     def __hash__(self):
         """
         Return the hash value of the product.
 
-        The hash value is computed based on the product name, allowing
+        The hash value is computed once from the product name, allowing
         Product instances to be used in hash-based collections like sets
-        and dictionaries.
+        and dictionaries. Products that compare equal share a name, so
+        they always share a hash.
 
         Returns:
             int: The hash value of the product name.
         """
-        return hash(self._name)
+        return self._hash
 
     def __eq__(self, other):
         """
         Compare two Product instances for equality based on name and price.
 
+        A product compared with itself, the usual case for store and cart
+        lookups, is answered without looking at its attributes.
+
         Args:
             other (Product): The other Product instance to compare with.
 
         Returns:
             bool: True if the name and price are equal, False otherwise.
         """
+        if self is other:
+            return True
         if not isinstance(other, Product):
             return NotImplemented
-        return self.name == other.name and self.price == other.price
+        return self._name == other._name and self._price == other._price
 
     def __lt__(self, product):
         """Implements lower than comparison of product based on their prices"""
@@ -75,6 +173,20 @@ class Product:
         """
         Displays the product details.
 
+        The description is built once and reused until the quantity,
+        active state or promotion of the product changes.
+
+        Returns:
+            str: The product details
+        """
+        if self._desc_cache is None:
+            self._desc_cache = self._describe()
+        return self._desc_cache
+
+    def _describe(self):
+        """
+        Builds the product description shown by __str__.
+
         Returns:
             str: The product details
         """
@@ -114,11 +226,25 @@ class Product:
         Raises:
             ValueError: If the quantity is not a positive integer.
         """
-        if not isinstance(new_quantity, int) or new_quantity < 0:
-            raise ValueError('Quantity should be a whole positive number.')
+        if not _is_whole(new_quantity):
+            raise ValueError(QUANTITY_SETTER_ERROR)
+        delta = new_quantity - self._quantity
         self._quantity = new_quantity
-        if self.quantity == 0:
-            self.active = False
+        self._quantity_changed(delta)
+        if new_quantity == 0:
+            self._set_active(False)
+
+    def _quantity_changed(self, delta):
+        """
+        Resets the cached description and reports a stock change to the
+        stores holding the product.
+
+        Args:
+            delta (int): The change in quantity.
+        """
+        self._desc_cache = None
+        for store in self._stores:
+            store._on_quantity_change(self, delta)
 
     @property
     def active(self):
@@ -139,8 +265,21 @@ class Product:
             value (bool): True to activate the product, False to deactivate it.
         """
         if not isinstance(value, bool):
-            raise ValueError("Active must be a boolean value.")
+            raise ValueError(ACTIVE_ERROR)
+        self._set_active(value)
+
+    def _set_active(self, value):
+        """
+        Stores an already validated active state and notifies the stores
+        holding the product.
+
+        Args:
+            value (bool): True to activate the product, False to deactivate it.
+        """
         self._active = value
+        self._desc_cache = None
+        for store in self._stores:
+            store._on_active_change(self)
 
     @property
     def promotion(self):
@@ -151,8 +290,11 @@ class Product:
     def promotion(self, promotion):
         """Sets the current promotion for the product."""
         if promotion and not isinstance(promotion, Promotion):
-            raise ValueError("Promotion must be an instance of the Promotion class.")
+            raise ValueError(PROMOTION_ERROR)
         self._promotion = promotion
+        self._desc_cache = None
+        for store in self._stores:
+            store._on_description_change(self)
 
     def buy(self, quantity):
         """
@@ -162,24 +304,52 @@ class Product:
             quantity (int): The number of items to purchase. Must be a positive number.
 
         Returns:
-            float: The total cost of the purchase, rounded to two decimal places.
+            float: The total cost of the purchase.
+
+        Raises:
+            ValueError: If the purchase is rejected by _validate_buy.
+        """
+        self._validate_buy(quantity)
+        return self._buy_unchecked(quantity)
+
+    def _validate_buy(self, quantity):
+        """
+        Checks that the specified quantity of the product can be bought.
+
+        Args:
+            quantity (int): The number of items to purchase. Must be a positive number.
 
         Raises:
             ValueError: If the quantity to buy is not a positive integer or
             is greater than the available stock or if the product is inactive.
         """
-        if not self.active:
-            raise ValueError("Product Inactive")
-        if not isinstance(quantity, int) or quantity <= 0:
-            raise ValueError("Quantity to buy must be a number greater than zero.")
-        if self.quantity < quantity:
+        if not self._active:
+            raise ValueError(INACTIVE_ERROR)
+        if not _is_whole(quantity, 1):
+            raise ValueError(BUY_QUANTITY_ERROR)
+        if self._quantity < quantity:
             raise ValueError(f"Quantity requested for {self.name} is larger than what exists.")
 
-        # Update the quantity
-        self.quantity = self.quantity - quantity
+    def _buy_unchecked(self, quantity):
+        """
+        Buys a quantity that has already been checked by _validate_buy.
+
+        The stock is updated directly, skipping the validation done by the
+        quantity setter.
 
-        if self.promotion:
-            return self.promotion.apply_promotion(self, quantity)
+        Args:
+            quantity (int): The number of items to purchase.
+
+        Returns:
+            float: The total cost of the purchase.
+        """
+        self._quantity -= quantity
+        self._quantity_changed(-quantity)
+        if self._quantity == 0:
+            self._set_active(False)
+
+        if self._promotion:
+            return self._promotion.apply_promotion(self, quantity)
 
         return self._price * quantity
 
@@ -197,6 +367,8 @@ class NonStockedProduct(Product):
         _quantity (int): Always set to 0 (non-stocked).
     """
 
+    __slots__ = ()
+
     def __init__(self, name, price):
         """
         Initializes a NonStockedProduct with the given name and price.
@@ -208,9 +380,9 @@ class NonStockedProduct(Product):
         """
         super().__init__(name, price, quantity=0)
 
-    def __str__(self):
+    def _describe(self):
         """
-        Displays the product details, indicating that the quantity is unlimited.
+        Builds the product details, indicating that the quantity is unlimited.
 
         Returns:
             str: The product details in the format "Name, Price: X, Quantity: Unlimited".
@@ -218,17 +390,9 @@ class NonStockedProduct(Product):
         promotion_info = f"Promotion: {self.promotion.name}" if self.promotion else "Promotion: None"
         return f"{self.name}, Price: {self.price}, Quantity: Unlimited, {promotion_info}"
 
-    @property
-    def quantity(self):
-        """
-        Overrides the quantity property to always return 0 for non-stocked products.
-
-        Returns:
-            int: Always returns 0.
-        """
-        return 0
-
-    @quantity.setter
+    # The getter is inherited: _quantity is set to 0 by __init__ and is never
+    # changed, since only the setter below and stocked purchases write it.
+    @Product.quantity.setter
     def quantity(self, new_quantity):
         """
         Overrides the quantity setter to prevent changes to the quantity.
@@ -237,28 +401,35 @@ class NonStockedProduct(Product):
         Raises:
             ValueError: Always raises an error since quantity cannot be modified.
         """
-        raise ValueError("Cannot set quantity for a non-stocked product.")
+        raise ValueError(NON_STOCKED_QUANTITY_ERROR)
 
-    def buy(self, quantity):
+    def _validate_buy(self, quantity):
         """
-        Simulates purchasing a non-stocked product. The quantity requested does not
-        affect the product's stock.
+        Checks the quantity requested for a non-stocked product. There is no
+        stock to check against, so only the quantity itself is validated.
 
         Args:
             quantity (int): The number of items to purchase. Must be a positive integer.
 
-        Returns:
-            float: The total cost of the purchase.
-
         Raises:
             ValueError: If the quantity to buy is not a positive integer.
         """
-        if not isinstance(quantity, int) or quantity <= 0:
-            raise ValueError("Quantity to buy must be a number greater than zero.")
+        if not _is_whole(quantity, 1):
+            raise ValueError(BUY_QUANTITY_ERROR)
 
-        # Calculate and return the total cost
-        if self.promotion:
-            return self.promotion.apply_promotion(self, quantity)
+    def _buy_unchecked(self, quantity):
+        """
+        Simulates purchasing a non-stocked product. The quantity requested does not
+        affect the product's stock.
+
+        Args:
+            quantity (int): The number of items to purchase.
+
+        Returns:
+            float: The total cost of the purchase.
+        """
+        if self._promotion:
+            return self._promotion.apply_promotion(self, quantity)
         return self._price * quantity
 
 
@@ -276,6 +447,8 @@ class LimitedProduct(Product):
         _maximum (int): The maximum quantity that can be purchased in a single order.
     """
 
+    __slots__ = ('_maximum',)
+
     def __init__(self, name, price, quantity, maximum):
         """
         Initializes a LimitedProduct with the given name, price, quantity, and maximum limit.
@@ -289,9 +462,9 @@ class LimitedProduct(Product):
         super().__init__(name, price, quantity)
         self._maximum = maximum
 
-    def __str__(self):
+    def _describe(self):
         """
-        Displays the product details, including the maximum limit per order.
+        Builds the product details, including the maximum limit per order.
 
         Returns:
             str: The product details in the format "Name, Price: X,
@@ -314,33 +487,22 @@ class LimitedProduct(Product):
         """
         return self._maximum
 
-    def buy(self, quantity):
+    def _validate_buy(self, quantity):
         """
-        Attempts to buy the specified quantity of the product, enforcing the maximum limit.
+        Checks the specified quantity of the product, enforcing the maximum limit.
 
         Args:
             quantity (int): The number of items to purchase. Must be a positive integer.
 
-        Returns:
-            float: The total cost of the purchase.
-
         Raises:
             ValueError: If the quantity to buy is greater than the allowed maximum,
                         if it exceeds the available stock, or if the product is inactive.
         """
-        if not self.active:
-            raise ValueError("Product Inactive")
-        if not isinstance(quantity, int) or quantity <= 0:
-            raise ValueError("Quantity to buy must be a number greater than zero.")
-        if quantity > self.maximum:
+        if not self._active:
+            raise ValueError(INACTIVE_ERROR)
+        if not _is_whole(quantity, 1):
+            raise ValueError(BUY_QUANTITY_ERROR)
+        if quantity > self._maximum:
             raise ValueError(f"Only {self.maximum} is allowed from [{self.name}]!")
-        if self.quantity < quantity:
+        if self._quantity < quantity:
             raise ValueError(f"Quantity requested for {self.name} is larger than what exists.")
-
-        # Update the quantity
-        self.quantity = self.quantity - quantity
-
-        if self.promotion:
-            return self.promotion.apply_promotion(self, quantity)
-
-        return self._price * quantity
@@ -9,6 +9,8 @@ class Promotion(ABC):
         _name (str): The name of the promotion.
     """
 
+    __slots__ = ('_name',)
+
     def __init__(self, name):
         """
         Initializes the promotion with a given name.
@@ -41,7 +43,7 @@ class Promotion(ABC):
             quantity (int): The quantity of the product being purchased.
 
         Returns:
-            float: The discount coefficient to be applied to the price.
+            float: The total price of the given quantity after the promotion.
         """
         pass
 
@@ -53,23 +55,23 @@ class SecondHalfPrice(Promotion):
     This promotion applies if the quantity of products is 2 or more.
     """
 
-    def apply_promotion(self, product, quantity):
+    __slots__ = ()
+
+    @staticmethod
+    def apply_promotion(product, quantity):
         """
         Applies the second half-price promotion.
 
-        If the quantity is 2 or more, it calculates the discount coefficient.
-        The formula gives half price for every second item.
+        Every second item is charged at half price.
 
         Args:
             product (Product): The product to which the promotion applies.
             quantity (int): The quantity of the product being purchased.
 
         Returns:
-            float: The discount coefficient to be applied to the price.
+            float: The total price of the given quantity after the promotion.
         """
-        if quantity >= 2:
-            return product.price * ((quantity // 2) * 1.5 + quantity % 2)
-        return product.price * quantity
+        return product.price * ((quantity // 2) * 1.5 + quantity % 2)
 
 
 class ThirdOneFree(Promotion):
@@ -79,11 +81,13 @@ class ThirdOneFree(Promotion):
     This promotion applies if the quantity of products is 3 or more.
     """
 
-    def apply_promotion(self, product, quantity):
+    __slots__ = ()
+
+    @staticmethod
+    def apply_promotion(product, quantity):
         """
         Applies the 'third one free' promotion.
 
-        If the quantity is 3 or more, it calculates the discount coefficient.
         For every three items, the third one is free.
 
         Args:
@@ -91,11 +95,9 @@ class ThirdOneFree(Promotion):
             quantity (int): The quantity of the product being purchased.
 
         Returns:
-            float: The discount coefficient to be applied to the price.
+            float: The total price of the given quantity after the promotion.
         """
-        if quantity >= 3:
-            return product.price * (quantity - (quantity // 3))
-        return product.price * quantity
+        return product.price * (quantity - quantity // 3)
 
 
 class PercentDiscount(Promotion):
@@ -105,6 +107,8 @@ class PercentDiscount(Promotion):
     This promotion reduces the price by a fixed percentage.
     """
 
+    __slots__ = ('_percent', '_factor')
+
     def __init__(self, name, percent):
         """
         Initializes the percentage discount promotion.
@@ -115,6 +119,8 @@ class PercentDiscount(Promotion):
         """
         super().__init__(name)
         self._percent = percent
+        # Share of the price left to pay, computed once per promotion
+        self._factor = (100 - percent) / 100
 
     def apply_promotion(self, product, quantity):
         """
@@ -127,6 +133,6 @@ class PercentDiscount(Promotion):
             quantity (int): The quantity of the product being purchased.
 
         Returns:
-            float: The discount coefficient to be applied to the price.
+            float: The total price of the given quantity after the promotion.
         """
-        return product.price * (100 - self._percent) / 100 * quantity
+        return product.price * quantity * self._factor
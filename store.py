@@ -1,3 +1,13 @@
+import logging
+from collections import Counter
+from operator import attrgetter
+
+from products import Product
+
+logger = logging.getLogger(__name__)
+_get_quantity = attrgetter("quantity")
+
+
 class Store:
     """
         A class to represent a store that manages a collection of products.
@@ -7,7 +17,9 @@ class Store:
         and managing inventory quantities.
 
         Attributes:
-            products (list): A list of Product instances available in the store.
+            products (dict): The Product instances available in the store, keyed by
+                             name. Dicts keep insertion order, so this is also
+                             the order in which the products are listed.
         """
 
     def __init__(self, products=None):
@@ -17,8 +29,18 @@ class Store:
         Args:
             products (list, optional): A list of Product instances to add to the store.
                                        Defaults to an empty list if not provided.
+                                       Only the first product with a given name is kept.
         """
-        self._products = products if products else []
+        # Bulk load: build the index in one pass instead of registering the
+        # products one by one; setdefault keeps the first product per name.
+        self._products = {}
+        for product in products or []:
+            self._products.setdefault(product.name, product)
+        self._total_quantity = sum(map(_get_quantity, self._products.values()))
+        self._active_cache = None
+        self._listing_cache = None
+        for product in self._products.values():
+            product._stores.add(self)
 
     def __contains__(self, product):
         """
@@ -28,9 +50,11 @@ class Store:
             product (Product): The Product object to check.
 
         Returns:
-            bool: True if the Product name matches this product's name, False otherwise.
+            bool: True if the store holds a product equal to the given one, False otherwise.
         """
-        return product in self._products
+        if not isinstance(product, Product):
+            return False
+        return self._products.get(product.name) == product
 
     def __add__(self, other_store):
         """
@@ -45,51 +69,163 @@ class Store:
         if not isinstance(other_store, Store):
             raise ValueError("Can only combine with another Store instance.")
 
-        combined_products = self._products + other_store._products
+        combined_products = [*self._products.values(), *other_store._products.values()]
         return Store(combined_products)
 
     def add_product(self, product):
         """
         Adds a product to the store.
 
+        A product whose name is already in the store is not added,
+        and a warning is logged instead.
+
         Args:
             product (Product): The product instance to be added.
+        """
+        if self._add(product):
+            logger.info("%s is successfully added to the store.", product.name)
+        else:
+            logger.warning("%s is already in store.", product.name)
 
-        Raises:
-            ValueError: If the product is already in the store.
+    def add_products(self, products):
         """
+        Adds several products to the store, logging a single summary line.
 
-        if product not in self._products:
-            self._products.append(product)
-            print(f"{product.name} is successfully added to the store.")
-        else:
-            print(f"{product.name} is already in store.")
+        Products whose name is already in the store are skipped.
+
+        Args:
+            products (iterable): The Product instances to be added.
+
+        Returns:
+            int: The number of products that were added.
+        """
+        added = offered = 0
+        for product in products:
+            offered += 1
+            added += self._add(product)
+        logger.info("%d of %d products added to the store.", added, offered)
+        return added
+
+    def _add(self, product):
+        """
+        Adds a product to the store without logging.
+
+        Args:
+            product (Product): The product instance to be added.
+
+        Returns:
+            bool: True if the product was added, False if its name is already in the store.
+        """
+        if product.name in self._products:
+            return False
+        self._register(product)
+        return True
 
     def remove_product(self, product):
         """
         Removes a product from the store.
 
+        A product that is not in the store is left alone,
+        and a warning is logged instead.
+
         Args:
             product (Product): The product instance to be removed.
+        """
+        if product in self:
+            self._unregister(self._products[product.name])
+            logger.info("%s is successfully removed from the store.", product.name)
+        else:
+            logger.warning("No %s in store.", product.name)
 
-        Raises:
-            ValueError: If the product is not found in the store.
+    def _register(self, product):
+        """
+        Indexes a product added to the store and starts tracking its stock.
+
+        Args:
+            product (Product): The product instance that was added.
+        """
+        self._products[product.name] = product
+        # New products are listed last, so they can simply be appended
+        if self._active_cache is not None and product.active:
+            self._active_cache[product.name] = product
+        self._listing_cache = None
+        product._stores.add(self)
+        self._total_quantity += product.quantity
+
+    def _unregister(self, product):
+        """
+        Drops a product removed from the store from the index and stops
+        tracking its stock.
+
+        Args:
+            product (Product): The product instance that was removed.
+        """
+        del self._products[product.name]
+        if self._active_cache is not None:
+            self._active_cache.pop(product.name, None)
+        self._listing_cache = None
+        product._stores.discard(self)
+        self._total_quantity -= product.quantity
+
+    def _on_quantity_change(self, product, delta):
+        """
+        Updates the running total when the stock of a product changes.
+
+        Notifications from a product that is not the one held under its
+        name, such as a copy sharing its store references, are ignored.
+
+        Args:
+            product (Product): The product whose stock changed.
+            delta (int): The change in quantity of the product.
+        """
+        if self._products.get(product.name) is not product:
+            return
+        self._total_quantity += delta
+        self._listing_cache = None
+
+    def _on_active_change(self, product):
+        """
+        Updates the active products and drops the rendered listing when a
+        product is activated or deactivated.
+
+        Args:
+            product (Product): The product whose active state changed.
         """
-        if product in self._products:
-            self._products.remove(product)
-            print(f"{product.name} is successfully removed from the store.")
+        if self._products.get(product.name) is not product:
+            return
+        self._listing_cache = None
+        if self._active_cache is None:
+            return
+        if product.active:
+            # A reactivated product has to go back to its place in the
+            # listing, which the next read rebuilds
+            self._active_cache = None
         else:
-            print(f"No {product.name} in store.")
+            self._active_cache.pop(product.name, None)
+
+    def _on_description_change(self, product):
+        """
+        Drops the rendered listing when the description of a product changes.
+
+        Args:
+            product (Product): The product whose description changed.
+        """
+        if self._products.get(product.name) is not product:
+            return
+        self._listing_cache = None
 
     @property
     def total_quantity(self) -> int:
         """
-        Calculates the total quantity of all products in the store.
+        Returns the total quantity of all products in the store.
+
+        The total is maintained incrementally as products are added, removed
+        or bought, so reading it does not walk the product list.
 
         Returns:
             int: The total quantity of products.
         """
-        return sum(product.quantity for product in self._products)
+        return self._total_quantity
 
     @property
     def all_products(self) -> list:
@@ -99,82 +235,230 @@ class Store:
         Returns:
             list: A list of active Product instances.
         """
-        return [product for product in self._products if product.active]
+        return list(self._active_products().values())
+
+    def _active_products(self):
+        """
+        Returns the active products in the store, keyed by name.
+
+        The dict is updated in place when products are added, removed or
+        deactivated, so reading it does not check every product.
+
+        Returns:
+            dict: The active Product instances by name, in listing order.
+        """
+        if self._active_cache is None:
+            self._active_cache = {name: product for name, product in self._products.items()
+                                  if product.active}
+        return self._active_cache
+
+    def iter_active_products(self):
+        """
+        Iterates over the active products in the store without copying them
+        into a new list.
+
+        Each product is checked as it is reached, so products can be bought
+        while iterating; a product that sells out before it is reached is
+        skipped.
+
+        Returns:
+            generator: The active Product instances, in listing order.
+        """
+        return (product for product in self._products.values() if product.active)
 
     def display_products(self):
         """
         Lists all the products available in the store.
+
+        The listing is assembled once and written with a single print call.
+        It is reused until a product is added, removed or changed.
         """
-        print("-" * 6)
-        for index, product in enumerate(self.all_products, start=1):
-            print(f"{index}. {product}")
-        print("-" * 6)
+        if self._listing_cache is None:
+            separator = "-" * 6
+            lines = [f"{index}. {product}"
+                     for index, product in enumerate(self._active_products().values(), start=1)]
+            self._listing_cache = "\n".join([separator, *lines, separator])
+        print(self._listing_cache)
 
     def order(self, shopping_list) -> float:
         """
         Processes an order for multiple products.
 
         Args:
-            shopping_list (list): A list of tuples, where each tuple contains a
-                                  Product instance and a quantity.
+            shopping_list (iterable): Tuples, where each tuple contains a
+                                      Product instance and a quantity.
 
         Returns:
             float: The total cost of the order.
 
         Raises:
             ValueError: If the product is not in the store or
-                        the quantity is invalid.
+                        the quantity is invalid. The message lists the
+                        problems of every rejected line, and no stock
+                        is changed when the order is rejected.
         """
+        # The list is walked twice (validation, then purchase), so any
+        # iterable, such as a generator or dict items, is read once up front
+        shopping_list = list(shopping_list)
+        if not shopping_list:
+            return 0.0
+
+        # A single line, the usual interactive order, needs neither the
+        # combined check nor the accumulator
+        if len(shopping_list) == 1:
+            product, quantity = shopping_list[0]
+            if product not in self:
+                raise ValueError(f'There is no {product.name} in the store.')
+            product._validate_buy(quantity)
+            return product._buy_unchecked(quantity)
+
+        # Validate the whole list first so the purchase loop below only
+        # has to update the stock and add up the prices. Nothing is bought
+        # unless every line can be, so a failing order leaves the stock as is.
+        # The problems of all lines are collected and reported together.
+        errors = []
+        requested = Counter()
+        for product, quantity in shopping_list:
+            if product not in self:
+                errors.append(f'There is no {product.name} in the store.')
+                continue
+            try:
+                product._validate_buy(quantity)
+            except ValueError as line_error:
+                errors.append(str(line_error))
+                continue
+            requested[product] += quantity
+
+        # Lines for the same product have to fit into its stock together
+        if not errors and len(requested) < len(shopping_list):
+            for product, quantity in requested.items():
+                try:
+                    product._validate_buy(quantity)
+                except ValueError as line_error:
+                    errors.append(str(line_error))
+
+        if errors:
+            raise ValueError(" ".join(errors))
+
         total_price = 0
         for product, quantity in shopping_list:
-            if product not in self._products:
-                raise ValueError(f'There is no {product.name} in the store.')
-            total_price += product.buy(quantity)
+            total_price += product._buy_unchecked(quantity)
         return total_price
 
-    def make_order(self):
+    def make_order(self, source=None):
         """
         Handles the process of making an order by prompting
         the user for product and quantity.
         Validates inputs and updates the store accordingly.
+        Each line is checked against the remaining stock as soon as it is
+        entered, so the final order is not rejected by a single bad line.
+
+        When a source of order lines is given, the lines are read from it
+        instead, without any prompts or messages, and the order is placed
+        directly.
+
+        Args:
+            source (iterable, optional): Pairs of product number, as shown by
+                                         display_products, and quantity.
+                                         Defaults to asking the user.
+
+        Returns:
+            float: The total cost of an order read from a source,
+                   or None for an interactive order.
+
+        Raises:
+            ValueError: If a line from the source is invalid or can not be bought.
         """
-        order_cart = {}
+        # Stock only changes once the order is processed, so the list of
+        # active products stays valid for the whole ordering session.
+        active_products = self.all_products
+        products_by_id = {product._id: product for product in active_products}
+        order_cart = Counter()
+
+        if source is not None:
+            for product_number, quantity in source:
+                order_line = self._validate_order_input(str(product_number), str(quantity),
+                                                        active_products)
+                if order_line is None:
+                    raise ValueError(f"Invalid order line: {product_number}, {quantity}")
+                self._add_to_cart(order_cart, *order_line)
+            return self.order([(products_by_id[product_id], quantity)
+                               for product_id, quantity in order_cart.items()])
+
         self.display_products()
         print("When you want to finish the order, enter an empty text.")
+        if not active_products:
+            print("No products available for ordering.")
 
-        while True:
-            active_products = self.all_products
-            if not active_products:
-                print("No products available for ordering.")
-                break
-
+        while active_products:
             product_input = input("Which product # do you want? ").strip()
             quantity_input = input("What amount do you want? ").strip()
 
             if not product_input or not quantity_input:
                 break
 
-            try:
-                product_index = int(product_input)
-                quantity = int(quantity_input)
-                if not 1 <= product_index <= len(active_products):
-                    raise ValueError("Invalid product index.")
-                product = active_products[product_index - 1]
-                if quantity < 1:
-                    raise ValueError("Invalid quantity.")
-            except (ValueError, TypeError):
+            order_line = self._validate_order_input(product_input, quantity_input,
+                                                    active_products)
+            if order_line is None:
                 print("Error adding product!\n")
                 continue
 
-            # Update the quantity in the order cart
-            if product in order_cart:
-                order_cart[product] += quantity
-            else:
-                order_cart[product] = quantity
+            try:
+                self._add_to_cart(order_cart, *order_line)
+            except ValueError as amount_error:
+                print(f"Error adding product! {amount_error}\n")
+                continue
 
             print("Product added to list!\n")
 
-        self.process_order(order_cart)
+        self.process_order({products_by_id[product_id]: quantity
+                            for product_id, quantity in order_cart.items()})
+
+    @staticmethod
+    def _add_to_cart(order_cart, product, quantity):
+        """
+        Adds an order line to the cart.
+
+        The line is checked against the stock together with what is already
+        in the cart, so a submitted cart can always be bought. The cart is
+        keyed by the product id so it only ever hashes plain integers.
+
+        Args:
+            order_cart (Counter): The cart, mapping product ids to quantities.
+            product (Product): The product to add.
+            quantity (int): The amount to add.
+
+        Raises:
+            ValueError: If the product can not be bought in the new cart quantity.
+        """
+        cart_quantity = order_cart[product._id] + quantity
+        product._validate_buy(cart_quantity)
+        order_cart[product._id] = cart_quantity
+
+    @staticmethod
+    def _validate_order_input(product_input, quantity_input, active_products):
+        """
+        Converts the user's order input into a product and a quantity.
+
+        Invalid input is reported by returning None rather than raising, since
+        mistyped input is an expected part of the interactive loop.
+
+        Args:
+            product_input (str): The product number entered by the user.
+            quantity_input (str): The amount entered by the user.
+            active_products (list): The products the user can choose from.
+
+        Returns:
+            tuple: The chosen Product instance and quantity,
+                   or None if the input is invalid.
+        """
+        if not (product_input.isdecimal() and quantity_input.isdecimal()):
+            return None
+        product_index = int(product_input)
+        quantity = int(quantity_input)
+        if not 1 <= product_index <= len(active_products) or quantity < 1:
+            return None
+        return active_products[product_index - 1], quantity
 
     def process_order(self, order_cart):
         """
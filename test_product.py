@@ -1,33 +1,38 @@
+import copy
+import gc
+import pickle
+import re
+
 import pytest
-from products import Product, NonStockedProduct, LimitedProduct
-from promotions import SecondHalfPrice, ThirdOneFree, PercentDiscount
+from products import (Product, NonStockedProduct, LimitedProduct, EMPTY_NAME_ERROR,
+                      PRICE_ERROR, QUANTITY_ERROR, QUANTITY_SETTER_ERROR, INACTIVE_ERROR,
+                      BUY_QUANTITY_ERROR, NON_STOCKED_QUANTITY_ERROR)
+from promotions import PercentDiscount
 from store import Store
 
+# Error messages checked with pytest.raises(match=...) below, compiled once
+APPLE_STOCK_ERROR_PATTERN = re.compile(r"Quantity requested for Apple is larger")
+SHIPPING_FEE_LIMIT_ERROR_PATTERN = re.compile(r"Only 2 is allowed from \[Shipping Fee\]!")
+SHIPPING_FEE_STOCK_ERROR_PATTERN = re.compile(r"Quantity requested for Shipping Fee "
+                                              r"is larger than what exists")
+ORDER_LINE_ERROR_PATTERN = re.compile(r"Invalid order line")
+SHIPPING_LIMIT_ERROR_PATTERN = re.compile(r"Only 1 is allowed")
+COMBINE_ERROR_PATTERN = re.compile(r"Can only combine with another Store instance\.")
 
-@pytest.fixture
-def setup_products():
-    """Fixture to set up sample products for testing."""
-    product1 = Product("MacBook Air M2", price=1450, quantity=100)
-    product2 = Product("Bose QuietComfort Earbuds", price=250, quantity=500)
-    product3 = NonStockedProduct("Windows License", price=125)
-    product4 = LimitedProduct("Shipping", price=10, quantity=250, maximum=1)
-
-    # Assign promotions
-    promo_half_price = SecondHalfPrice("Second Half price!")
-    promo_third_free = ThirdOneFree("Third One Free!")
-    promo_30_percent = PercentDiscount("30% off!", percent=30)
-
-    product1.promotion = promo_half_price
-    product2.promotion = promo_third_free
-    product3.promotion = promo_30_percent
-
-    return product1, product2, product3, product4
 
-
-@pytest.fixture
-def setup_store(setup_products):
-    """Fixture to set up a store with products for testing."""
-    return Store(list(setup_products))
+# The promotion, per-product and store fixtures live in conftest.py
+@pytest.fixture(scope="module")
+def sample_products():
+    """
+    Fixture with products shared by the read-only tests of this module.
+    Tests that change a product build their own instance instead.
+    """
+    return {
+        "apple": Product("Apple", 1.5, 10),
+        "small_apple": Product("Apple", 1.5, 5),
+        "orange": Product("Orange", 1.2, 5),
+        "banana": Product("Banana", 0.5, 20),
+    }
 
 
 def test_product_initialization():
@@ -36,54 +41,77 @@ def test_product_initialization():
     assert isinstance(product, Product), "Valid Product isn't created"
 
 
-def test_empty_name():
-    """Test that Product creation with an empty name raises a ValueError."""
-    with pytest.raises(ValueError, match='Product name can not be empty.'):
-        Product("", price=1450, quantity=100)
+@pytest.mark.parametrize("name, price, quantity, message", [
+    ("", 1450, 100, EMPTY_NAME_ERROR),
+    ("MacBook Air M2", -10, 100, PRICE_ERROR),
+    ("MacBook Air M2", 144, -12.3, QUANTITY_ERROR),
+    ("Macbook Air M2", 144, 20.4, QUANTITY_ERROR),
+    ("Macbook Air M2", 144, True, QUANTITY_ERROR),
+], ids=["empty_name", "negative_price", "negative_quantity", "float_quantity",
+        "bool_quantity"])
+def test_invalid_product(name, price, quantity, message):
+    """Test that Product creation with invalid arguments raises a ValueError."""
+    with pytest.raises(ValueError) as excinfo:
+        Product(name, price=price, quantity=quantity)
+    assert excinfo.value.args[0] == message
 
 
-def test_negative_price():
-    """Test that Product creation with a negative price raises a ValueError."""
-    with pytest.raises(ValueError, match='Price should be a positive number.'):
-        Product("MacBook Air M2", price=-10, quantity=100)
+def test_product_with_non_str_name():
+    """Test that names which can not be interned are kept as given."""
+    class Name(str):
+        pass
 
+    assert Product(Name("Apple"), 1.5, 10).name == "Apple"
+    assert Product(42, 1, 1).name == 42
 
-def test_negative_quantity():
-    """Test that Product creation with a negative quantity raises a ValueError."""
-    with pytest.raises(ValueError, match='Quantity should be a positive number.'):
-        Product("MacBook Air M2", price=144, quantity=-12.3)
 
-
-def test_float_quantity():
-    """Test that Product creation with a float quantity raises a ValueError."""
-    with pytest.raises(ValueError, match='Quantity should be a positive number.'):
-        Product("Macbook Air M2", price=144, quantity=20.4)
-
-
-def test_product_hash():
+def test_product_hash(sample_products):
     """Test that the hash of the product is based on the name."""
-    product1 = Product("Apple", 1.5, 10)
-    product2 = Product("Apple", 1.5, 5)
+    product1 = sample_products["apple"]
+    product2 = sample_products["small_apple"]
 
     assert hash(product1) == hash(product2)
 
     # Test different names result in different hashes
-    product3 = Product("Orange", 1.2, 5)
+    product3 = sample_products["orange"]
     assert hash(product1) != hash(product3)
 
 
-def test_product_str():
+@pytest.mark.parametrize("product", [
+    Product("Apple", 1.5, 10),
+    NonStockedProduct("E-Book", price=10),
+    LimitedProduct("Shipping Fee", price=5, quantity=10, maximum=2),
+], ids=["product", "nonstocked", "limited"])
+def test_product_has_no_instance_dict(product):
+    """Test that products keep their state in __slots__ only."""
+    assert not hasattr(product, "__dict__")
+    with pytest.raises(AttributeError):
+        product.colour = "red"
+
+
+@pytest.mark.parametrize("promotion, active, expected", [
+    (None, True, "Apple, Price: 1.5, Quantity: 10, Promotion: None"),
+    (PercentDiscount(name="10% Off", percent=10), True,
+     "Apple, Price: 1.5, Quantity: 10, Promotion: 10% Off"),
+    (None, False, "Apple is out of stock."),
+], ids=["no_promotion", "promotion", "inactive"])
+def test_product_str(promotion, active, expected):
     """Test the __str__ method for displaying the product details."""
     product = Product("Apple", 1.5, 10)
+    product.promotion = promotion
+    product.active = active
+    assert str(product) == expected
+
+
+def test_product_str_reflects_changes():
+    """Test that the cached description is refreshed after the product changes."""
+    product = Product("Apple", 1.5, 10)
     assert str(product) == "Apple, Price: 1.5, Quantity: 10, Promotion: None"
 
-    # Test with an active product with a promotion
-    mock_promotion = PercentDiscount(name="10% Off", percent=10)
-    product.promotion = mock_promotion
-    assert str(product) == "Apple, Price: 1.5, Quantity: 10, Promotion: 10% Off"
+    product.buy(4)
+    assert str(product) == "Apple, Price: 1.5, Quantity: 6, Promotion: None"
 
-    # Test with an inactive product
-    product.active = False
+    product.quantity = 0
     assert str(product) == "Apple is out of stock."
 
 
@@ -94,22 +122,19 @@ def test_product_becomes_inactive():
     assert not mac.active, "Product didn't become inactive when it reached 0 quantity"
 
 
-def test_product_name_getter():
+def test_product_name_getter(sample_products):
     """Test that the product name is returned correctly via the property."""
-    product = Product("Banana", 0.5, 20)
-    assert product.name == "Banana"
+    assert sample_products["banana"].name == "Banana"
 
 
-def test_product_price_getter():
+def test_product_price_getter(sample_products):
     """Test that the product price is returned correctly via the property."""
-    product = Product("Banana", 0.5, 20)
-    assert product.price == 0.5
+    assert sample_products["banana"].price == 0.5
 
 
-def test_product_quantity_getter():
+def test_product_quantity_getter(sample_products):
     """Test that the quantity getter returns the correct value."""
-    product = Product("Banana", 0.5, 20)
-    assert product.quantity == 20
+    assert sample_products["banana"].quantity == 20
 
 
 def test_product_quantity_setter():
@@ -124,8 +149,9 @@ def test_product_quantity_setter():
     assert product.active is False
 
     # Test setting an invalid quantity
-    with pytest.raises(ValueError):
+    with pytest.raises(ValueError) as excinfo:
         product.quantity = -5
+    assert excinfo.value.args[0] == QUANTITY_SETTER_ERROR
 
 
 def test_product_activation():
@@ -146,34 +172,30 @@ def test_product_buy():
     assert product.quantity == 8
 
     # Test buying more than available stock
-    with pytest.raises(ValueError, match="Quantity requested for Apple is larger"):
+    with pytest.raises(ValueError, match=APPLE_STOCK_ERROR_PATTERN):
         product.buy(15)
 
     # Test buying when the product is inactive
     product.active = False
-    with pytest.raises(ValueError, match="Product Inactive"):
+    with pytest.raises(ValueError) as excinfo:
         product.buy(1)
+    assert excinfo.value.args[0] == INACTIVE_ERROR
 
 
-def test_product_buy_invalid_quantity():
+@pytest.mark.parametrize("quantity", [0, -3, 2.5, True])
+def test_product_buy_invalid_quantity(quantity):
     """Test buying with invalid quantities."""
     product = Product("Apple", 1.5, 10)
-
-    # Test buying with quantity <= 0
-    with pytest.raises(ValueError, match="Quantity to buy must be "
-                                         "a number greater than zero."):
-        product.buy(0)
-
-    with pytest.raises(ValueError, match="Quantity to buy must be "
-                                         "a number greater than zero."):
-        product.buy(-3)
+    with pytest.raises(ValueError) as excinfo:
+        product.buy(quantity)
+    assert excinfo.value.args[0] == BUY_QUANTITY_ERROR
 
 
-def test_product_eq():
+def test_product_eq(sample_products):
     """Test the equality comparison (__eq__) for two products."""
-    product1 = Product("Apple", 1.5, 10)
-    product2 = Product("Apple", 1.5, 5)
-    product3 = Product("Orange", 1.2, 5)
+    product1 = sample_products["apple"]
+    product2 = sample_products["small_apple"]
+    product3 = sample_products["orange"]
 
     assert product1 == product2, ("Products with the same name and price"
                                   " should be equal")
@@ -181,10 +203,10 @@ def test_product_eq():
                                   " should not be equal")
 
 
-def test_product_lt_gt():
+def test_product_lt_gt(sample_products):
     """Test the less-than and greater-than comparison for products."""
-    product1 = Product("Apple", 1.5, 10)
-    product2 = Product("Orange", 1.2, 5)
+    product1 = sample_products["apple"]
+    product2 = sample_products["orange"]
 
     assert product2 < product1, ("Product with lower price should be "
                                  "less than product with higher price")
@@ -208,9 +230,9 @@ def test_nonstocked_product_quantity_setter():
     raises a ValueError.
     """
     product = NonStockedProduct("E-Book", price=10)
-    with pytest.raises(ValueError, match="Cannot set quantity for "
-                                         "a non-stocked product."):
+    with pytest.raises(ValueError) as excinfo:
         product.quantity = 5
+    assert excinfo.value.args[0] == NON_STOCKED_QUANTITY_ERROR
 
 
 def test_nonstocked_product_buy():
@@ -219,9 +241,9 @@ def test_nonstocked_product_buy():
     total_cost = product.buy(3)
     assert total_cost == 30
 
-    with pytest.raises(ValueError, match="Quantity to buy must be a number "
-                                         "greater than zero."):
+    with pytest.raises(ValueError) as excinfo:
         product.buy(-1)
+    assert excinfo.value.args[0] == BUY_QUANTITY_ERROR
 
 
 # LimitedProduct tests
@@ -245,47 +267,42 @@ def test_limited_product_buy_within_limit():
 def test_limited_product_buy_exceeds_limit():
     """Test that attempting to buy more than the allowed maximum raises a ValueError."""
     product = LimitedProduct("Shipping Fee", price=5, quantity=10, maximum=2)
-    with pytest.raises(ValueError, match="Only 2 is allowed from \\[Shipping Fee\\]!"):
+    with pytest.raises(ValueError, match=SHIPPING_FEE_LIMIT_ERROR_PATTERN):
         product.buy(3)
 
 
 def test_limited_product_buy_exceeds_stock():
     """Test that attempting to buy more than available stock raises a ValueError."""
     product = LimitedProduct("Shipping Fee", price=5, quantity=1, maximum=2)
-    with pytest.raises(ValueError, match="Quantity requested for Shipping Fee "
-                                         "is larger than what exists"):
+    with pytest.raises(ValueError, match=SHIPPING_FEE_STOCK_ERROR_PATTERN):
         product.buy(2)
 
 
 # Promotions tests
-def test_second_half_price_promotion(setup_products):
-    """Test the second half-price promotion."""
-    product1, _, _, _ = setup_products
-    total_cost = product1.buy(2)  # Second one should be half price
-    assert total_cost == 1450 * 1.5
-
-
-def test_third_one_free_promotion(setup_products):
-    """Test the third-one-free promotion."""
-    _, product2, _, _ = setup_products
-    total_cost = product2.buy(3)  # Should only pay for two
-    assert total_cost == 250 * 2
-
-
-def test_percent_discount_promotion(setup_products):
-    """Test the percentage discount promotion."""
-    _, _, product3, _ = setup_products
-    total_cost = product3.buy(1)
-    assert total_cost == 125 * 0.7  # 30% off
-
-
-def test_limited_product(setup_products):
+@pytest.mark.parametrize("product_fixture, quantity, expected_cost", [
+    ("macbook", 2, pytest.approx(2175.0)),  # Second one should be half price
+    ("macbook", 1, 1450),
+    ("macbook", 3, pytest.approx(3625.0)),
+    ("earbuds", 3, 250 * 2),  # Should only pay for two
+    ("earbuds", 2, 250 * 2),
+    ("earbuds", 6, 250 * 4),
+    ("license_", 1, pytest.approx(87.5)),  # 30% off
+], ids=["second_half_price", "second_half_price_single", "second_half_price_odd",
+        "third_one_free", "third_one_free_below_three", "third_one_free_twice",
+        "percent_discount"])
+def test_promotion(request, product_fixture, quantity, expected_cost):
+    """Test the price of promoted products."""
+    # Only the product under test is built
+    total_cost = request.getfixturevalue(product_fixture).buy(quantity)
+    assert total_cost == expected_cost
+
+
+def test_limited_product(shipping):
     """Test that a limited product cannot be purchased in excess
        of the maximum quantity."""
-    _, _, _, product4 = setup_products
     with pytest.raises(ValueError):
-        product4.buy(2)  # Should not allow more than 1
-    total_cost = product4.buy(1)
+        shipping.buy(2)  # Should not allow more than 1
+    total_cost = shipping.buy(1)
     assert total_cost == 10
 
 
@@ -298,6 +315,32 @@ def test_add_product(setup_store):
     assert new_product in store.all_products
 
 
+def test_add_products(setup_store, caplog):
+    """Test adding several products at once with a single log line."""
+    store = setup_store
+    new_products = [Product("iPhone 14", price=999, quantity=200),
+                    Product("MacBook Air M2", price=1450, quantity=5),
+                    Product("iPad", price=599, quantity=20)]
+    with caplog.at_level("INFO", logger="store"):
+        assert store.add_products(new_products) == 2
+    assert caplog.messages == ["2 of 3 products added to the store."]
+    assert store.total_quantity == 100 + 500 + 250 + 200 + 20
+
+
+def test_store_contains(setup_store):
+    """Test that store membership is decided by the product name and price."""
+    store = setup_store
+    assert Product("MacBook Air M2", price=1450, quantity=1) in store
+    assert Product("MacBook Air M2", price=999, quantity=1) not in store
+    assert Product("iPhone 14", price=999, quantity=1) not in store
+    assert None not in store
+    assert "MacBook Air M2" not in store
+
+    # A second product with the same name is not added
+    store.add_product(Product("MacBook Air M2", price=999, quantity=1))
+    assert len(store.all_products) == 4
+
+
 def test_remove_product(setup_store):
     """Test that products can be removed from the store."""
     store = setup_store
@@ -312,6 +355,50 @@ def test_total_quantity(setup_store):
     assert store.total_quantity == 100 + 500 + 250
 
 
+def test_total_quantity_follows_stock_changes(setup_store):
+    """Test that the total quantity is kept up to date as the stock changes."""
+    store = setup_store
+    macbook, earbuds = store.all_products[0], store.all_products[1]
+
+    store.order([(macbook, 2)])
+    earbuds.quantity = 100
+    assert store.total_quantity == 98 + 100 + 250
+
+    store.remove_product(macbook)
+    assert store.total_quantity == 100 + 250
+
+    store.add_product(Product("iPhone 14", price=999, quantity=200))
+    assert store.total_quantity == 100 + 250 + 200
+
+
+def test_copied_product_does_not_change_store(setup_store):
+    """Test that a copy of a product, which is not in the store, leaves the store as is."""
+    store = setup_store
+    macbook = store.all_products[0]
+    copied_macbook = copy.copy(macbook)
+
+    copied_macbook.quantity = 0
+    assert store.total_quantity == 100 + 500 + 250
+    assert macbook in store.all_products
+
+
+@pytest.mark.parametrize("duplicate", [
+    copy.copy,
+    lambda product: pickle.loads(pickle.dumps(product)),
+], ids=["copy", "pickle"])
+def test_duplicated_product_is_detached(setup_store, duplicate):
+    """Test that a copied or unpickled product keeps its state but no store."""
+    store = setup_store
+    shipping = store.all_products[3]
+    duplicated = duplicate(shipping)
+
+    assert str(duplicated) == str(shipping)
+    assert duplicated == shipping and hash(duplicated) == hash(shipping)
+    assert duplicated._id != shipping._id
+    assert len(duplicated._stores) == 0
+    assert len(shipping._stores) == 1
+
+
 def test_list_active_products(setup_store):
     """
     Test that the total quantity is equal to the sum of quantities
@@ -325,42 +412,182 @@ def test_list_active_products(setup_store):
     assert store.total_quantity == total_quantity
 
 
+def test_iter_active_products(setup_store):
+    """Test that iterating over active products matches the active list."""
+    store = setup_store
+    store.all_products[0].active = False
+    assert list(store.iter_active_products()) == store.all_products
+    assert len(store.all_products) == 3
+
+
+def test_buy_while_iterating_active_products(setup_store):
+    """Test that products can be bought, and sell out, during iteration."""
+    store = setup_store
+    store.all_products[0].quantity = 1
+    bought = []
+    for product in store.iter_active_products():
+        store.order([(product, 1)])
+        bought.append(product.name)
+    assert bought == ["MacBook Air M2", "Bose QuietComfort Earbuds",
+                      "Windows License", "Shipping"]
+    assert store.all_products[0].name == "Bose QuietComfort Earbuds"
+
+
+def test_active_products_follow_product_state(setup_store):
+    """Test that the active product list is refreshed when products change."""
+    store = setup_store
+    macbook, earbuds = store.all_products[0], store.all_products[1]
+
+    macbook.active = False
+    assert macbook not in store.all_products
+
+    store.order([(earbuds, 500)])
+    assert earbuds not in store.all_products
+
+    macbook.active = True
+    assert store.all_products[0] is macbook
+
+    iphone = Product("iPhone 14", price=999, quantity=200)
+    store.add_product(iphone)
+    assert store.all_products[-1] is iphone
+    store.remove_product(macbook)
+    assert macbook not in store.all_products
+
+
+def test_display_products_reflects_changes(setup_store, capsys):
+    """Test that the rendered listing is refreshed after products change."""
+    store = setup_store
+    macbook, earbuds = store.all_products[0], store.all_products[1]
+    store.display_products()
+    assert "Quantity: 100," in capsys.readouterr().out
+
+    store.order([(macbook, 2)])
+    earbuds.promotion = None
+    store.display_products()
+    listing = capsys.readouterr().out
+    assert "Quantity: 98," in listing
+    assert "Bose QuietComfort Earbuds, Price: 250, Quantity: 500, Promotion: None" in listing
+
+
 def test_order_with_valid_products(setup_store):
     """Test that an order with valid products processes correctly."""
     store = setup_store
     shopping_list = [(store.all_products[0], 2), (store.all_products[1], 3)]
     total_cost = store.order(shopping_list)
-    assert total_cost == store.all_products[0].buy(2) + store.all_products[1].buy(3)
+    # MacBook: 1450 + 725 with the second half price,
+    # earbuds: 2 * 250 with the third one free
+    assert total_cost == 2175 + 500
+    assert store.all_products[0].quantity == 98
+    assert store.all_products[1].quantity == 497
 
 
-def test_order_with_invalid_product(setup_store):
-    """Test that an order with a product not in the store raises an error."""
+def test_rejected_order_leaves_stock_unchanged(setup_store):
+    """Test that an order failing on a later line buys nothing."""
     store = setup_store
-    invalid_product = Product("Invalid Product", price=100, quantity=10)
+    macbook, earbuds = store.all_products[0], store.all_products[1]
+
     with pytest.raises(ValueError):
-        store.order([(invalid_product, 1)])
+        store.order([(macbook, 2), (earbuds, 501)])
+    assert macbook.quantity == 100
+    assert earbuds.quantity == 500
 
+    # Repeated lines are checked against the stock together
+    with pytest.raises(ValueError):
+        store.order([(macbook, 60), (macbook, 60)])
+    assert macbook.quantity == 100
 
-import pytest
 
+def test_make_order_from_source(setup_store):
+    """Test placing an order from a source of lines instead of user input."""
+    store = setup_store
+    macbook = store.all_products[0]
+    total_cost = store.make_order([(1, 1), ("1", "1"), (3, 2)])
+    assert total_cost == pytest.approx(2175.0 + 175.0)
+    assert macbook.quantity == 98
+
+    with pytest.raises(ValueError, match=ORDER_LINE_ERROR_PATTERN):
+        store.make_order([(9, 1)])
+    with pytest.raises(ValueError, match=SHIPPING_LIMIT_ERROR_PATTERN):
+        store.make_order([(4, 1), (4, 1)])
+    assert store.total_quantity == 98 + 500 + 250
 
-# Assuming Store is imported or defined above this line
-# from your_module import Store
 
-@pytest.fixture
-def stores():
-    """Fixture to create example store instances."""
-    store1 = Store([
-        {"name": "Product A", "quantity": 10, "price": 5.0},
-        {"name": "Product B", "quantity": 5, "price": 10.0}
-    ])
-    store2 = Store([
-        {"name": "Product C", "quantity": 3, "price": 7.0},
-        {"name": "Product D", "quantity": 2, "price": 15.0}
-    ])
-    empty_store = Store([])
+def test_process_order(setup_store, capsys):
+    """Test processing a cart that maps products to quantities."""
+    store = setup_store
+    macbook, shipping = store.all_products[0], store.all_products[3]
 
-    return store1, store2, empty_store
+    store.process_order({macbook: 2, shipping: 1})
+    assert "Order made! Total payment: $2185.0" in capsys.readouterr().out
+
+    store.process_order({})
+    assert "No products to order!" in capsys.readouterr().out
+
+
+def test_make_order_interactive(setup_store, monkeypatch, capsys):
+    """Test the interactive ordering loop with the user input mocked."""
+    store = setup_store
+    inputs = iter(["1", "2", "x", "1", "", ""])
+    monkeypatch.setattr("builtins.input", lambda *_: next(inputs))
+
+    assert store.make_order() is None
+    output = capsys.readouterr().out
+    assert "Error adding product!" in output
+    assert "Order made! Total payment: $2175.0" in output
+    assert store.all_products[0].quantity == 98
+
+
+def test_rejected_order_reports_every_line(setup_store):
+    """Test that a rejected order names the problem of each bad line."""
+    store = setup_store
+    macbook, shipping = store.all_products[0], store.all_products[3]
+    invalid_product = Product("Invalid Product", price=100, quantity=10)
+
+    with pytest.raises(ValueError) as excinfo:
+        store.order([(invalid_product, 1), (macbook, 1), (shipping, 2)])
+    message = str(excinfo.value)
+    assert "There is no Invalid Product in the store." in message
+    assert "Only 1 is allowed from [Shipping]!" in message
+
+
+def test_validate_order_input(setup_store):
+    """Test that order input is converted to a product and quantity, or None."""
+    active_products = setup_store.all_products
+    assert Store._validate_order_input("2", "3", active_products) == (active_products[1], 3)
+
+    for product_input, quantity_input in [("x", "1"), ("1", "1.5"), ("0", "1"),
+                                          ("5", "1"), ("1", "0"), ("1", "-2")]:
+        assert Store._validate_order_input(product_input, quantity_input,
+                                           active_products) is None
+
+
+def test_order_with_empty_or_single_line(setup_store):
+    """Test orders without lines and with a single line."""
+    store = setup_store
+    assert store.order([]) == 0
+
+    earbuds = store.all_products[1]
+    assert store.order([(earbuds, 3)]) == 250 * 2
+    assert earbuds.quantity == 497
+
+
+def test_order_from_any_iterable(setup_store):
+    """Test that an order can be given as dict items or a generator."""
+    store = setup_store
+    macbook, earbuds = store.all_products[0], store.all_products[1]
+
+    assert store.order({earbuds: 3}.items()) == 250 * 2
+    assert store.order(line for line in [(macbook, 1), (earbuds, 3)]) == 1450 + 250 * 2
+    assert macbook.quantity == 99
+    assert earbuds.quantity == 494
+
+
+def test_order_with_invalid_product(setup_store):
+    """Test that an order with a product not in the store raises an error."""
+    store = setup_store
+    invalid_product = Product("Invalid Product", price=100, quantity=10)
+    with pytest.raises(ValueError):
+        store.order([(invalid_product, 1)])
 
 
 def test_add_stores(stores):
@@ -369,22 +596,25 @@ def test_add_stores(stores):
     combined_store = store1 + store2
 
     expected_products = [
-        {"name": "Product A", "quantity": 10, "price": 5.0},
-        {"name": "Product B", "quantity": 5, "price": 10.0},
-        {"name": "Product C", "quantity": 3, "price": 7.0},
-        {"name": "Product D", "quantity": 2, "price": 15.0}
+        ("Product A", 5.0, 10),
+        ("Product B", 10.0, 5),
+        ("Product C", 7.0, 3),
+        ("Product D", 15.0, 2)
     ]
 
     # Check that the combined store has the expected products
-    assert combined_store._products == expected_products
-    # Check the length of the combined products
-    assert len(combined_store._products) == 4
+    assert [(product.name, product.price, product.quantity)
+            for product in combined_store.all_products] == expected_products
+    assert combined_store.total_quantity == 20
+    # Check that the combined stores are left unchanged
+    assert len(store1.all_products) == 2
+    assert len(store2.all_products) == 2
 
 
 def test_add_invalid_type(stores):
     """Test adding a non-Store instance raises ValueError."""
     store1, _, _ = stores
-    with pytest.raises(ValueError, match="Can only combine with another Store instance."):
+    with pytest.raises(ValueError, match=COMBINE_ERROR_PATTERN):
         result = store1 + "not_a_store"
 
 
@@ -394,4 +624,18 @@ def test_add_empty_store(stores):
     combined_store = store1 + empty_store
 
     # The result should be the same as store1
-    assert combined_store._products == store1._products
+    assert combined_store.all_products == store1.all_products
+
+
+def test_combined_stores_are_released():
+    """Test that products do not keep the stores they were combined into alive."""
+    product = Product("Product A", quantity=10, price=5.0)
+    store1 = Store([product])
+    store2 = Store([Product("Product B", quantity=5, price=10.0)])
+    for _ in range(5):
+        store1 = store1 + store2
+    gc.collect()
+
+    assert len(product._stores) == 1
+    product.quantity = 4
+    assert store1.total_quantity == 4 + 5